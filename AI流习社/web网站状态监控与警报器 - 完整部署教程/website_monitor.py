@@ -2,24 +2,54 @@
 # Website Status Monitor & Alert System
 # 一个强大的网站监控工具，支持多种通知方式
 
+import sys
+import asyncio
+import aiohttp
 import requests
-import smtplib
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
 import logging
+import logging.handlers
 import threading
-from datetime import datetime, timedelta
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
-from typing import List, Dict, Optional
+import queue
+import itertools
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Callable, Tuple, TYPE_CHECKING
 import sqlite3
-import schedule
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 import os
 from pathlib import Path
+from string import Template
+
+# smtplib 和 email.mime 只在发送邮件时才导入，不发邮件时不占用启动时间和内存
+if TYPE_CHECKING:
+    import smtplib
+
+try:
+    import orjson  # 可选依赖，安装后JSON序列化更快
+except ImportError:
+    orjson = None
+
+def dumps_json(data, indent: bool = False) -> bytes:
+    """序列化为UTF-8编码的JSON，优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# 配置对象创建后不再修改；Python 3.10+ 同时使用 __slots__，省去实例 __dict__
+_DATACLASS_OPTIONS = {'frozen': True}
+if sys.version_info >= (3, 10):
+    _DATACLASS_OPTIONS['slots'] = True
 
 # 配置数据结构
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class WebsiteConfig:
     url: str
     name: str
@@ -27,8 +57,14 @@ class WebsiteConfig:
     expected_status: int = 200
     check_content: Optional[str] = None
     check_interval: int = 300  # 5分钟
+    # check_content 的UTF-8编码，加载配置时计算一次，检查时直接在字节流中查找
+    _check_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.check_content:
+            object.__setattr__(self, '_check_bytes', self.check_content.encode('utf-8'))
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class EmailConfig:
     smtp_server: str
     smtp_port: int
@@ -37,99 +73,437 @@ class EmailConfig:
     from_email: str
     to_emails: List[str]
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class WebhookConfig:
     url: str
     method: str = "POST"
     headers: Dict[str, str] = None
 
+class SiteStatus:
+    """网站当前状态，每个网站一个实例，检查后原地更新字段而不是重建字典"""
+    
+    __slots__ = ('name', 'url', 'status', 'response_time', 'status_code',
+                 'error_message', 'ts_epoch')
+    
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.status = 'unknown'
+        self.response_time: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.error_message: Optional[str] = None
+        self.ts_epoch: Optional[float] = None  # 最后检查时间，只在生成报告时格式化
+    
+    def update(self, status: str, response_time: Optional[float], status_code: Optional[int],
+               error_message: Optional[str], ts_epoch: float):
+        """用一次检查结果更新状态，参数顺序与 check_website_async 返回的元组一致"""
+        self.status = status
+        self.response_time = response_time
+        self.status_code = status_code
+        self.error_message = error_message
+        self.ts_epoch = ts_epoch
+
+# SQL语句定义为模块常量，每次传入同一个字符串对象，保证命中SQLite语句缓存
+_SQL_INSERT_MONITOR = '''
+    INSERT INTO monitor_logs 
+    (website_name, url, status, response_time_us, status_code, error_message)
+    VALUES '''
+_MONITOR_ROW_PLACEHOLDER = '(?, ?, ?, ?, ?, ?)'
+
+_SQL_INSERT_ALERT = '''
+    INSERT INTO alert_logs 
+    (website_name, alert_type, message, sent_successfully)
+    VALUES '''
+_ALERT_ROW_PLACEHOLDER = '(?, ?, ?, ?)'
+
+# monitor_logs 中状态以小整数存储，响应时间以整数微秒存储
+_STATUS_CODES = {'down': 0, 'up': 1, 'unknown': 2}
+_STATUS_NAMES = {code: name for name, code in _STATUS_CODES.items()}
+
+# 旧版SQLite单条语句最多999个绑定参数
+_SQLITE_MAX_VARIABLES = 999
+
+# SMTP长连接的保活间隔（秒），需小于服务器的空闲超时
+_SMTP_KEEPALIVE_INTERVAL = 240
+
+# 后台写入线程每次最多合并写入的记录数
+_WRITER_BATCH_SIZE = 1000
+
+# 累计写入这么多条记录后执行一次ANALYZE，让查询规划器使用索引统计
+_ANALYZE_AFTER_ROWS = 1000
+
+_SQL_HISTORY = '''
+    SELECT id, website_name, url, status, response_time_us, status_code, error_message, timestamp
+    FROM monitor_logs 
+    WHERE website_name = ? 
+    AND timestamp > datetime('now', '-' || ? || ' hours')
+    ORDER BY timestamp DESC
+'''
+
+_SQL_SELECT_ARCHIVE = '''
+    SELECT id, website_name, url, status, response_time_us, status_code, error_message, timestamp
+    FROM monitor_logs
+    WHERE id > ? AND timestamp < ?
+    ORDER BY id
+    LIMIT ?
+'''
+
+_SQL_DELETE_ARCHIVED = '''
+    DELETE FROM monitor_logs WHERE id <= ? AND timestamp < ?
+'''
+
+# 把旧版（status为文本、response_time为毫秒REAL）的 monitor_logs 迁移到整数编码
+_SQL_MIGRATE_MONITOR = '''
+    INSERT INTO monitor_logs
+    (id, website_name, url, status, response_time_us, status_code, error_message, timestamp)
+    SELECT id, website_name, url,
+           CASE status WHEN 'down' THEN 0 WHEN 'up' THEN 1 ELSE 2 END,
+           CAST(ROUND(response_time * 1000) AS INTEGER),
+           status_code, error_message, timestamp
+    FROM monitor_logs_old
+'''
+
+# 归档时每次从数据库读取的记录数
+_ARCHIVE_CHUNK_ROWS = 50000
+
+def _to_utc_naive(value: datetime) -> datetime:
+    """带时区的时间转换为UTC后去掉时区，不带时区的时间视为UTC原样返回"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@lru_cache(maxsize=32)
+def _multi_row_insert_sql(insert_prefix: str, row_placeholder: str, row_count: int) -> str:
+    """构建一次插入多行的 INSERT ... VALUES (...), (...) 语句，相同行数复用同一字符串"""
+    return insert_prefix + ', '.join([row_placeholder] * row_count)
+
 class DatabaseManager:
     """数据库管理器 - 存储监控历史"""
     
-    def __init__(self, db_path: str = "monitor.db"):
+    def __init__(self, db_path: str = "monitor.db", archive_dir: str = "logs/archive"):
         self.db_path = db_path
+        self.archive_dir = Path(archive_dir)
+        # 长连接 + 自动提交模式，多线程访问由锁串行化
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                     isolation_level=None, cached_statements=128)
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
         self.init_database()
+        
+        # 检查记录先进入队列，由后台线程批量写入，检查路径不等待fsync
+        self._write_q = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._db_writer, name="db-writer", daemon=True)
+        self._writer.start()
     
     def init_database(self):
         """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        with self._lock:
+            # WAL模式下提交无需回滚日志的fsync，NORMAL同步级别避免双重fsync
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('PRAGMA temp_store=MEMORY')
+            self._conn.execute('PRAGMA cache_size=-20000')
+            self._conn.execute('PRAGMA busy_timeout=5000')
+            
+            self._create_monitor_table()
+            self._migrate_monitor_table()
+            
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS alert_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    website_name TEXT NOT NULL,
+                    alert_type TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    sent_successfully BOOLEAN,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # 按网站查询时间范围内的记录走索引范围扫描，而不是全表扫描
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_logs_name_ts
+                ON monitor_logs (website_name, timestamp DESC)
+            ''')
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_alerts_name_ts
+                ON alert_logs (website_name, timestamp DESC)
+            ''')
+            
+            self._analyzed = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone() is not None
+            self._rows_written = 0
+    
+    def _create_monitor_table(self):
+        """创建 monitor_logs 表（调用方需持有锁）"""
+        self._conn.execute('''
             CREATE TABLE IF NOT EXISTS monitor_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 website_name TEXT NOT NULL,
                 url TEXT NOT NULL,
-                status TEXT NOT NULL,
-                response_time REAL,
+                status INTEGER NOT NULL,
+                response_time_us INTEGER,
                 status_code INTEGER,
                 error_message TEXT,
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+    
+    def _migrate_monitor_table(self):
+        """旧版数据库的 monitor_logs 转换为整数编码的新表（调用方需持有锁）"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(monitor_logs)')}
+        if 'response_time_us' in columns:
+            return
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alert_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                website_name TEXT NOT NULL,
-                alert_type TEXT NOT NULL,
-                message TEXT NOT NULL,
-                sent_successfully BOOLEAN,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        self._conn.execute('BEGIN')
+        try:
+            self._conn.execute('ALTER TABLE monitor_logs RENAME TO monitor_logs_old')
+            self._create_monitor_table()
+            self._conn.execute(_SQL_MIGRATE_MONITOR)
+            self._conn.execute('DROP TABLE monitor_logs_old')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+        self.logger.warning("monitor_logs 已迁移为整数编码格式")
+    
+    @staticmethod
+    def _encode_row(row: tuple) -> tuple:
+        """把 (名称, 地址, 状态, 毫秒响应时间, 状态码, 错误) 编码为存储格式"""
+        website_name, url, status, response_time, status_code, error_message = row
+        return (website_name, url, _STATUS_CODES.get(status, 2),
+                None if response_time is None else int(round(response_time * 1000)),
+                status_code, error_message)
+    
+    def _maybe_analyze(self, row_count: int):
+        """首次积累足够记录后收集一次统计信息"""
+        if self._analyzed:
+            return
         
-        conn.commit()
-        conn.close()
+        self._rows_written += row_count
+        if self._rows_written >= _ANALYZE_AFTER_ROWS:
+            with self._lock:
+                self._conn.execute('ANALYZE')
+            self._analyzed = True
+    
+    def _insert_rows(self, insert_prefix: str, row_placeholder: str, rows: List[tuple]):
+        """在单个事务内批量插入，按参数上限分块，每块展开为一条多行INSERT"""
+        if not rows:
+            return
+        
+        chunk_size = max(1, _SQLITE_MAX_VARIABLES // len(rows[0]))
+        
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for start in range(0, len(rows), chunk_size):
+                    chunk = rows[start:start + chunk_size]
+                    sql = _multi_row_insert_sql(insert_prefix, row_placeholder, len(chunk))
+                    self._conn.execute(sql, list(itertools.chain.from_iterable(chunk)))
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+    
+    def _db_writer(self):
+        """后台写入线程：取出队列中已积累的记录，合并为一个事务写入"""
+        while True:
+            row = self._write_q.get()
+            if row is None:
+                return
+            
+            batch = [row]
+            stop = False
+            while len(batch) < _WRITER_BATCH_SIZE:
+                try:
+                    row = self._write_q.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            
+            try:
+                batch = [self._encode_row(row) for row in batch]
+                self._insert_rows(_SQL_INSERT_MONITOR, _MONITOR_ROW_PLACEHOLDER, batch)
+                self._maybe_analyze(len(batch))
+            except Exception as e:
+                self.logger.error("写入检查记录失败: %s", e)
+            
+            if stop:
+                return
     
     def log_check(self, website_name: str, url: str, status: str, 
                   response_time: float = None, status_code: int = None, 
                   error_message: str = None):
-        """记录检查结果"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO monitor_logs 
+        """记录检查结果（异步写入）"""
+        self._write_q.put(
             (website_name, url, status, response_time, status_code, error_message)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (website_name, url, status, response_time, status_code, error_message))
-        
-        conn.commit()
-        conn.close()
+        )
+    
+    def log_checks_bulk(self, rows: List[tuple]):
+        """批量记录检查结果（异步写入），每行为 (website_name, url, status, response_time, status_code, error_message)"""
+        for row in rows:
+            self._write_q.put(row)
     
     def log_alert(self, website_name: str, alert_type: str, message: str, 
                   sent_successfully: bool):
         """记录警报发送"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO alert_logs 
-            (website_name, alert_type, message, sent_successfully)
-            VALUES (?, ?, ?, ?)
-        ''', (website_name, alert_type, message, sent_successfully))
-        
-        conn.commit()
-        conn.close()
+        self.log_alerts_bulk([(website_name, alert_type, message, sent_successfully)])
+    
+    def log_alerts_bulk(self, rows: List[tuple]):
+        """批量记录警报，每行为 (website_name, alert_type, message, sent_successfully)"""
+        self._insert_rows(_SQL_INSERT_ALERT, _ALERT_ROW_PLACEHOLDER, rows)
     
     def get_website_history(self, website_name: str, hours: int = 24) -> List[Dict]:
         """获取网站历史记录"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            rows = self._conn.execute(_SQL_HISTORY, (website_name, int(hours))).fetchall()
         
-        cursor.execute('''
-            SELECT * FROM monitor_logs 
-            WHERE website_name = ? 
-            AND timestamp > datetime('now', '-{} hours')
-            ORDER BY timestamp DESC
-        '''.format(hours), (website_name,))
+        # 读取时把整数编码还原为状态名称和毫秒响应时间
+        return [
+            {
+                'id': row_id,
+                'website_name': name,
+                'url': url,
+                'status': _STATUS_NAMES.get(status, 'unknown'),
+                'response_time': None if response_time_us is None else response_time_us / 1000,
+                'status_code': status_code,
+                'error_message': error_message,
+                'timestamp': timestamp
+            }
+            for row_id, name, url, status, response_time_us, status_code, error_message, timestamp
+            in rows
+        ]
+    
+    def archive_to_parquet(self, before: datetime) -> int:
+        """把早于 before（UTC）的检查记录按月归档为Parquet文件并从数据库删除，返回归档条数
         
-        columns = [description[0] for description in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        需要安装 pyarrow，未安装时抛出 ImportError。
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('website_name', pa.string()),
+            ('url', pa.string()),
+            ('status', pa.int8()),
+            ('response_time_us', pa.int64()),
+            ('status_code', pa.int64()),
+            ('error_message', pa.string()),
+            ('timestamp', pa.timestamp('s')),
+        ])
+        
+        cutoff = _to_utc_naive(before).strftime('%Y-%m-%d %H:%M:%S')
+        run_stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 先写入以点开头的临时文件（数据集扫描会忽略），全部成功后再改名，
+        # 避免中途失败留下残缺文件导致下次重复归档
+        writers = {}
+        paths = {}
+        last_id = 0
+        total = 0
+        try:
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(
+                        _SQL_SELECT_ARCHIVE, (last_id, cutoff, _ARCHIVE_CHUNK_ROWS)
+                    ).fetchall()
+                if not rows:
+                    break
+                
+                last_id = rows[-1][0]
+                total += len(rows)
+                
+                # 按月份分组，每个月份写入各自的文件
+                by_month = {}
+                for row in rows:
+                    by_month.setdefault(row[7][:7].replace('-', ''), []).append(row)
+                
+                for month, month_rows in by_month.items():
+                    columns = list(zip(*month_rows))
+                    table = pa.table(
+                        [pa.array(column).cast(column_type)
+                         for column, column_type in zip(columns, schema.types)],
+                        schema=schema
+                    )
+                    
+                    writer = writers.get(month)
+                    if writer is None:
+                        paths[month] = self.archive_dir / f".logs_{month}_{run_stamp}.parquet.tmp"
+                        writer = writers[month] = pq.ParquetWriter(
+                            paths[month], schema, compression='zstd'
+                        )
+                    writer.write_table(table)
+        except BaseException:
+            for writer in writers.values():
+                writer.close()
+            for path in paths.values():
+                path.unlink(missing_ok=True)
+            raise
+        
+        for writer in writers.values():
+            writer.close()
+        for month, path in paths.items():
+            path.rename(self.archive_dir / f"logs_{month}_{run_stamp}.parquet")
+        
+        # 文件全部写完后才删除数据库中的记录
+        if total:
+            with self._lock:
+                self._conn.execute(_SQL_DELETE_ARCHIVED, (last_id, cutoff))
+        
+        return total
+    
+    def get_archived_stats(self, since: datetime = None) -> Dict[str, Dict]:
+        """从Parquet归档中按网站统计检查次数、正常次数和平均响应时间（毫秒）
+        
+        只读取需要的列，since 为UTC时间，为空时统计全部归档。
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        
+        if not any(self.archive_dir.glob('logs_*.parquet')):
+            return {}
+        
+        dataset = ds.dataset(self.archive_dir, format='parquet')
+        row_filter = None
+        if since is not None:
+            row_filter = ds.field('timestamp') >= pa.scalar(_to_utc_naive(since),
+                                                            pa.timestamp('s'))
+        
+        table = dataset.to_table(columns=['website_name', 'status', 'response_time_us'],
+                                 filter=row_filter)
+        table = table.append_column(
+            'is_up', pc.cast(pc.equal(table['status'], _STATUS_CODES['up']), pa.int64())
+        )
+        stats = table.group_by('website_name').aggregate([
+            ('is_up', 'count'), ('is_up', 'sum'), ('response_time_us', 'mean')
+        ])
         
-        conn.close()
-        return results
+        return {
+            name: {
+                'checks': checks,
+                'up': up,
+                'avg_response_time': None if mean_us is None else round(mean_us / 1000, 2)
+            }
+            for name, checks, up, mean_us in zip(
+                stats['website_name'].to_pylist(),
+                stats['is_up_count'].to_pylist(),
+                stats['is_up_sum'].to_pylist(),
+                stats['response_time_us_mean'].to_pylist()
+            )
+        }
+    
+    def close(self):
+        """写完队列中剩余的记录后关闭数据库连接"""
+        self._write_q.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
 
 class NotificationManager:
     """通知管理器 - 处理各种通知方式"""
@@ -139,6 +513,63 @@ class NotificationManager:
         self.email_config = email_config
         self.webhook_config = webhook_config
         self.logger = logging.getLogger(__name__)
+        
+        # Webhook复用同一个会话，避免每次告警都重新握手
+        self._webhook_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                              max_retries=Retry(total=2, backoff_factor=0.5))
+        self._webhook_session.mount('http://', adapter)
+        self._webhook_session.mount('https://', adapter)
+        
+        # SMTP长连接，多个警报复用同一次TLS握手和登录
+        self._smtp: Optional["smtplib.SMTP"] = None
+        self._smtp_lock = threading.Lock()
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+    
+    def _get_smtp(self) -> "smtplib.SMTP":
+        """返回可用的SMTP连接，未连接时建立连接并登录（调用方需持有锁）"""
+        import smtplib
+        
+        if self._smtp is None:
+            server = smtplib.SMTP(self.email_config.smtp_server, 
+                                self.email_config.smtp_port, timeout=30)
+            try:
+                server.starttls()
+                server.login(self.email_config.username, self.email_config.password)
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+            
+            if self._keepalive_thread is None:
+                self._keepalive_thread = threading.Thread(
+                    target=self._smtp_keepalive, name="smtp-keepalive", daemon=True
+                )
+                self._keepalive_thread.start()
+        
+        return self._smtp
+    
+    def _reset_smtp(self):
+        """断开SMTP连接（调用方需持有锁）"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+    
+    def _smtp_keepalive(self):
+        """定期发送NOOP，防止空闲连接被服务器关闭"""
+        while not self._keepalive_stop.wait(_SMTP_KEEPALIVE_INTERVAL):
+            with self._smtp_lock:
+                if self._smtp is None:
+                    continue
+                try:
+                    self._smtp.noop()
+                except Exception:
+                    self._reset_smtp()
     
     def send_email_alert(self, subject: str, message: str) -> bool:
         """发送邮件警报"""
@@ -146,31 +577,43 @@ class NotificationManager:
             self.logger.warning("邮件配置未设置，跳过邮件通知")
             return False
         
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        
         try:
-            msg = MimeMultipart()
+            msg = MIMEMultipart()
             msg['From'] = self.email_config.from_email
             msg['To'] = ', '.join(self.email_config.to_emails)
             msg['Subject'] = subject
             
-            msg.attach(MimeText(message, 'html'))
-            
-            server = smtplib.SMTP(self.email_config.smtp_server, 
-                                self.email_config.smtp_port)
-            server.starttls()
-            server.login(self.email_config.username, self.email_config.password)
+            msg.attach(MIMEText(message, 'html'))
             
             text = msg.as_string()
-            server.sendmail(self.email_config.from_email, 
-                          self.email_config.to_emails, text)
-            server.quit()
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().sendmail(self.email_config.from_email, 
+                                              self.email_config.to_emails, text)
+                except smtplib.SMTPServerDisconnected:
+                    # 长连接已被服务器断开，重连后重试一次
+                    self._reset_smtp()
+                    self._get_smtp().sendmail(self.email_config.from_email, 
+                                              self.email_config.to_emails, text)
             
-            self.logger.info(f"邮件警报发送成功: {subject}")
+            self.logger.info("邮件警报发送成功: %s", subject)
             return True
             
         except Exception as e:
-            self.logger.error(f"邮件发送失败: {str(e)}")
+            self.logger.error("邮件发送失败: %s", e)
             return False
     
+    def close(self):
+        """关闭SMTP长连接和Webhook会话"""
+        self._keepalive_stop.set()
+        with self._smtp_lock:
+            self._reset_smtp()
+        self._webhook_session.close()
+    
     def send_webhook_alert(self, website_name: str, status: str, 
                           message: str) -> bool:
         """发送Webhook警报"""
@@ -189,25 +632,121 @@ class NotificationManager:
             headers = self.webhook_config.headers or {}
             headers.setdefault('Content-Type', 'application/json')
             
-            response = requests.request(
+            response = self._webhook_session.request(
                 method=self.webhook_config.method,
                 url=self.webhook_config.url,
-                json=payload,
+                data=dumps_json(payload),
                 headers=headers,
                 timeout=10
             )
             
             if response.status_code == 200:
-                self.logger.info(f"Webhook警报发送成功: {website_name}")
+                self.logger.info("Webhook警报发送成功: %s", website_name)
                 return True
             else:
-                self.logger.error(f"Webhook发送失败，状态码: {response.status_code}")
+                self.logger.error("Webhook发送失败，状态码: %s", response.status_code)
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Webhook发送失败: {str(e)}")
+            self.logger.error("Webhook发送失败: %s", e)
             return False
 
+# 检查记录在数据库中保留的天数，更早的记录归档为Parquet
+_ARCHIVE_AFTER_DAYS = 30
+
+# 每日报告中归档统计覆盖的天数
+_ARCHIVE_STATS_DAYS = 90
+
+# 域名解析结果的缓存时间（秒），期间的检查不再重复解析DNS
+_DNS_CACHE_TTL = 300
+
+# 内容检查最多读取的响应体字节数
+_MAX_CONTENT_BYTES = 2 * 1024 * 1024
+
+# 通知邮件模板，模块加载时编译一次
+_DOWN_ALERT_TPL = Template("""
+        <html>
+        <body>
+            <h2>🚨 网站监控警报</h2>
+            <p><strong>网站名称:</strong> $name</p>
+            <p><strong>网站地址:</strong> $url</p>
+            <p><strong>当前状态:</strong> <span style="color: red;">离线</span></p>
+            <p><strong>错误信息:</strong> $error_message</p>
+            <p><strong>检查时间:</strong> $timestamp</p>
+            
+            <hr>
+            <p style="color: gray; font-size: 12px;">
+                此邮件由网站监控系统自动发送，请及时处理网站故障。
+            </p>
+        </body>
+        </html>
+        """)
+
+_RECOVERY_ALERT_TPL = Template("""
+        <html>
+        <body>
+            <h2>✅ 网站恢复通知</h2>
+            <p><strong>网站名称:</strong> $name</p>
+            <p><strong>网站地址:</strong> $url</p>
+            <p><strong>当前状态:</strong> <span style="color: green;">在线</span></p>
+            <p><strong>响应时间:</strong> ${response_time}ms</p>
+            <p><strong>状态码:</strong> $status_code</p>
+            <p><strong>恢复时间:</strong> $timestamp</p>
+            
+            <hr>
+            <p style="color: gray; font-size: 12px;">
+                网站已恢复正常访问，感谢您的关注。
+            </p>
+        </body>
+        </html>
+        """)
+
+_DAILY_REPORT_TPL = Template("""
+        <html>
+        <body>
+            <h2>📊 每日网站监控报告</h2>
+            <p><strong>报告日期:</strong> $date</p>
+            
+            <h3>状态概览</h3>
+            <ul>
+                <li>总监控网站: $total</li>
+                <li>正常网站: $up</li>
+                <li>异常网站: $down</li>
+                <li>可用率: ${uptime_percentage}%</li>
+            </ul>
+            
+            <h3>各网站当前状态</h3>
+            <table border="1" style="border-collapse: collapse;">
+                <tr>
+                    <th>网站名称</th>
+                    <th>状态</th>
+                    <th>响应时间</th>
+                    <th>最后检查时间</th>
+                    <th>归档可用率 (近${archive_days}天)</th>
+                    <th>归档平均响应时间 (近${archive_days}天)</th>
+                </tr>
+        $rows
+            </table>
+            
+            <hr>
+            <p style="color: gray; font-size: 12px;">
+                网站监控系统每日自动报告
+            </p>
+        </body>
+        </html>
+        """)
+
+_REPORT_ROW_TPL = Template("""
+                <tr>
+                    <td>$name</td>
+                    <td style="color: $color;">$status</td>
+                    <td>${response_time}ms</td>
+                    <td>$time</td>
+                    <td>$archived_uptime</td>
+                    <td>$archived_response_time</td>
+                </tr>
+            """)
+
 class WebsiteMonitor:
     """网站监控器 - 核心监控逻辑"""
     
@@ -215,26 +754,54 @@ class WebsiteMonitor:
         self.config_file = config_file
         self.websites: List[WebsiteConfig] = []
         self.notification_manager: NotificationManager = None
-        self.db_manager = DatabaseManager()
-        self.website_status: Dict[str, Dict] = {}
+        self.website_status: Dict[str, SiteStatus] = {}
+        self.request_headers = {'User-Agent': 'Website Monitor Bot 1.0'}
+        # 内容检查通过时记录的 ETag / Last-Modified，用于条件请求
+        self._cache_validators: Dict[str, Dict[str, str]] = {}
+        # 每个网站预先生成的专用检查函数，按网站名称存放 (配置, 检查函数)，见 _compile_checker
+        self._checkers: Dict[str, Tuple[WebsiteConfig, Callable]] = {}
         
         # 设置日志
         self.setup_logging()
         self.logger = logging.getLogger(__name__)
         
+        # 在日志配置之后创建，数据库迁移等初始化日志才能输出
+        self.db_manager = DatabaseManager()
+        
         # 加载配置
         self.load_config()
+        
+        # 发送通知、写数据库等阻塞操作放到线程池，不占用事件循环
+        self._pool = ThreadPoolExecutor(max_workers=min(32, len(self.websites) + 4))
     
     def setup_logging(self):
         """设置日志系统"""
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
+        log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        
+        # 日志格式不使用线程、进程和源码位置信息，关闭它们的采集
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        logging._srcfile = None
+        
+        # 写文件由后台监听线程完成，记录日志时只需入队
+        file_handler = logging.FileHandler(log_dir / 'monitor.log')
+        file_handler.setFormatter(logging.Formatter(log_format))
+        log_queue = queue.SimpleQueue()
+        self._log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+        self._log_listener.start()
+        
+        # 队列中的记录只合并消息参数，完整格式由文件处理器生成
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
         
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            format=log_format,
             handlers=[
-                logging.FileHandler(log_dir / 'monitor.log'),
+                queue_handler,
                 logging.StreamHandler()
             ]
         )
@@ -251,6 +818,14 @@ class WebsiteMonitor:
                     WebsiteConfig(**site) 
                     for site in config_data.get('websites', [])
                 ]
+                self._checkers = {
+                    website.name: (website, self._compile_checker(website))
+                    for website in self.websites
+                }
+                self.website_status = {
+                    website.name: SiteStatus(website.name, website.url)
+                    for website in self.websites
+                }
                 
                 # 加载邮件配置
                 email_config = config_data.get('email_config')
@@ -268,12 +843,12 @@ class WebsiteMonitor:
                         webhook_config=WebhookConfig(**webhook_config)
                     )
                 
-                self.logger.info(f"配置加载成功，监控 {len(self.websites)} 个网站")
+                self.logger.info("配置加载成功，监控 %s 个网站", len(self.websites))
             else:
                 self.create_default_config()
                 
         except Exception as e:
-            self.logger.error(f"配置加载失败: {str(e)}")
+            self.logger.error("配置加载失败: %s", e)
             self.create_default_config()
     
     def create_default_config(self):
@@ -311,95 +886,204 @@ class WebsiteMonitor:
             }
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=2, ensure_ascii=False)
+        with open(self.config_file, 'wb') as f:
+            f.write(dumps_json(default_config, indent=True))
         
-        self.logger.info(f"已创建默认配置文件: {self.config_file}")
+        self.logger.info("已创建默认配置文件: %s", self.config_file)
         self.logger.info("请编辑配置文件后重新启动监控器")
     
+    def create_session(self) -> aiohttp.ClientSession:
+        """创建带连接池和DNS缓存的HTTP会话，同一会话内的检查复用TCP/TLS连接
+        
+        需在事件循环中调用。安装了 aiodns 时使用异步DNS解析，否则使用默认的线程池解析。
+        """
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except (ImportError, RuntimeError):
+            resolver = None
+        
+        # 不设置每主机连接上限：超时计时包含等待空闲连接的时间，
+        # 同一主机下的多个网站同时到期时，排队会被误判为超时
+        connector = aiohttp.TCPConnector(
+            limit=max(len(self.websites) * 2, 10),
+            keepalive_timeout=60,
+            ttl_dns_cache=_DNS_CACHE_TTL,
+            resolver=resolver
+        )
+        return aiohttp.ClientSession(connector=connector, headers=self.request_headers)
+    
     def check_website(self, website: WebsiteConfig) -> Dict:
-        """检查单个网站状态"""
-        result = {
+        """检查单个网站状态（同步封装，便于单次检查）"""
+        async def _check():
+            async with self.create_session() as session:
+                return await self.check_website_async(session, website)
+        
+        check = asyncio.run(_check())
+        self.db_manager.log_checks_bulk([self.build_log_row(website, check)])
+        return self.build_result(website, check)
+    
+    @staticmethod
+    def build_log_row(website: WebsiteConfig, check: tuple) -> tuple:
+        """把检查结果转换为 monitor_logs 的一行"""
+        status, response_time, status_code, error_message, _ = check
+        return (website.name, website.url, status, response_time, status_code, error_message)
+    
+    @staticmethod
+    def build_result(website: WebsiteConfig, check: tuple) -> Dict:
+        """把检查结果转换为字典，只在需要发送通知或返回给调用方时使用"""
+        status, response_time, status_code, error_message, ts_epoch = check
+        return {
             'name': website.name,
             'url': website.url,
-            'status': 'unknown',
-            'response_time': None,
-            'status_code': None,
-            'error_message': None,
-            'timestamp': datetime.now()
+            'status': status,
+            'response_time': response_time,
+            'status_code': status_code,
+            'error_message': error_message,
+            'timestamp': datetime.fromtimestamp(ts_epoch)
         }
+    
+    async def _fetch_status(self, session: aiohttp.ClientSession, website: WebsiteConfig,
+                            timeout: aiohttp.ClientTimeout) -> int:
+        """用HEAD请求获取状态码，服务器不支持HEAD时退回GET且不读取响应体"""
+        async with session.head(website.url, timeout=timeout,
+                                allow_redirects=True) as response:
+            if response.status not in (405, 501):
+                return response.status
         
-        try:
-            start_time = time.time()
-            
-            # 发送HTTP请求
-            response = requests.get(
-                website.url,
-                timeout=website.timeout,
-                allow_redirects=True,
-                headers={'User-Agent': 'Website Monitor Bot 1.0'}
-            )
+        async with session.get(website.url, timeout=timeout,
+                               allow_redirects=True) as response:
+            return response.status
+    
+    @staticmethod
+    def _content_target(website: WebsiteConfig, charset: Optional[str]) -> bytes:
+        """按响应声明的编码取得要查找的字节串，UTF-8页面直接使用预先编码的结果"""
+        if charset and charset.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            try:
+                return website.check_content.encode(charset)
+            except (LookupError, UnicodeEncodeError):
+                pass
+        return website._check_bytes
+    
+    async def _fetch_content(self, session: aiohttp.ClientSession, website: WebsiteConfig,
+                             timeout: aiohttp.ClientTimeout) -> tuple:
+        """流式读取响应体查找预期内容，返回 (状态码, 是否找到)"""
+        validators = self._cache_validators.get(website.name)
+        
+        async with session.get(website.url, timeout=timeout, allow_redirects=True,
+                               headers=validators) as response:
+            if response.status == 304 and validators:
+                return response.status, True
             
-            end_time = time.time()
-            response_time = round((end_time - start_time) * 1000, 2)  # 毫秒
+            found = False
+            if response.status == website.expected_status:
+                target = self._content_target(website, response.charset)
+                overlap = len(target) - 1
+                tail = b''
+                bytes_read = 0
+                
+                # 直接在原始字节中逐块查找，命中即停止读取；
+                # 只把上一块末尾和本块开头拼接检查，以免内容跨块被截断
+                async for chunk in response.content.iter_chunked(65536):
+                    if target in chunk or overlap and target in tail + chunk[:overlap]:
+                        found = True
+                        break
+                    if overlap:
+                        tail = (tail + chunk[-overlap:])[-overlap:]
+                    bytes_read += len(chunk)
+                    if bytes_read >= _MAX_CONTENT_BYTES:
+                        break
             
-            result['response_time'] = response_time
-            result['status_code'] = response.status_code
-            
-            # 检查状态码
-            if response.status_code == website.expected_status:
-                # 检查页面内容（如果配置了）
-                if website.check_content:
-                    if website.check_content in response.text:
-                        result['status'] = 'up'
-                    else:
-                        result['status'] = 'down'
-                        result['error_message'] = f"页面不包含预期内容: {website.check_content}"
-                else:
-                    result['status'] = 'up'
+            # 只有内容检查通过时才缓存校验头，下次可用条件请求跳过响应体
+            new_validators = {}
+            if found:
+                if 'ETag' in response.headers:
+                    new_validators['If-None-Match'] = response.headers['ETag']
+                if 'Last-Modified' in response.headers:
+                    new_validators['If-Modified-Since'] = response.headers['Last-Modified']
+            if new_validators:
+                self._cache_validators[website.name] = new_validators
             else:
-                result['status'] = 'down'
-                result['error_message'] = f"状态码异常: {response.status_code}"
+                self._cache_validators.pop(website.name, None)
             
-            # 记录到数据库
-            self.db_manager.log_check(
-                website.name, website.url, result['status'],
-                response_time, response.status_code, result['error_message']
-            )
+            return response.status, found
+    
+    def _compile_checker(self, website: WebsiteConfig) -> Callable:
+        """按网站配置生成专用的检查协程函数
+        
+        超时对象、期望状态码和错误信息在这里预先确定，检查时不再判断配置分支。
+        返回的函数接收会话，返回 (状态码, 错误信息)，正常时错误信息为 None。
+        """
+        timeout = aiohttp.ClientTimeout(total=website.timeout)
+        expected_status = website.expected_status
+        
+        if not website.check_content:
+            # 无内容检查：只取响应头
+            async def check_status(session: aiohttp.ClientSession) -> tuple:
+                status_code = await self._fetch_status(session, website, timeout)
+                if status_code == expected_status:
+                    return status_code, None
+                return status_code, f"状态码异常: {status_code}"
             
-        except requests.exceptions.Timeout:
-            result['status'] = 'down'
-            result['error_message'] = f"请求超时 (>{website.timeout}s)"
-            self.db_manager.log_check(
-                website.name, website.url, result['status'],
-                error_message=result['error_message']
-            )
+            return check_status
+        
+        content_error = f"页面不包含预期内容: {website.check_content}"
+        
+        async def check_content(session: aiohttp.ClientSession) -> tuple:
+            status_code, found = await self._fetch_content(session, website, timeout)
+            # 304说明内容自上次检查通过后未变化，按正常请求的期望状态码记录
+            if status_code == 304 and found:
+                return expected_status, None
+            if status_code == expected_status:
+                return status_code, None if found else content_error
+            return status_code, f"状态码异常: {status_code}"
+        
+        return check_content
+    
+    async def check_website_async(self, session: aiohttp.ClientSession,
+                                  website: WebsiteConfig) -> tuple:
+        """异步检查单个网站状态（不写数据库，由调用方记录）
+        
+        返回 (状态, 响应时间毫秒, 状态码, 错误信息, 检查时间戳)，时间戳在发起检查时取得。
+        """
+        ts_epoch = time.time()
+        loop = asyncio.get_running_loop()
+        # 用 is 比较配置对象，避免冻结数据类逐字段计算哈希和比较
+        entry = self._checkers.get(website.name)
+        if entry is not None and entry[0] is website:
+            checker = entry[1]
+        else:
+            checker = self._compile_checker(website)
+            self._checkers[website.name] = (website, checker)
+        
+        try:
+            start_time = loop.time()
             
-        except requests.exceptions.ConnectionError:
-            result['status'] = 'down'
-            result['error_message'] = "连接失败"
-            self.db_manager.log_check(
-                website.name, website.url, result['status'],
-                error_message=result['error_message']
-            )
+            # 发送HTTP请求并判断结果
+            status_code, error_message = await checker(session)
+            
+            end_time = loop.time()
+            response_time = round((end_time - start_time) * 1000, 2)  # 毫秒
+            
+            return ('down' if error_message else 'up', response_time, status_code,
+                    error_message, ts_epoch)
+            
+        except asyncio.TimeoutError:
+            return 'down', None, None, f"请求超时 (>{website.timeout}s)", ts_epoch
+            
+        except aiohttp.ClientConnectionError:
+            return 'down', None, None, "连接失败", ts_epoch
             
         except Exception as e:
-            result['status'] = 'down'
-            result['error_message'] = f"未知错误: {str(e)}"
-            self.db_manager.log_check(
-                website.name, website.url, result['status'],
-                error_message=result['error_message']
-            )
-        
-        return result
+            return 'down', None, None, f"未知错误: {str(e)}", ts_epoch
     
     def handle_status_change(self, website_name: str, old_status: str, 
-                           new_status: str, check_result: Dict):
-        """处理状态变化"""
+                           new_status: str, check_result: Dict) -> List[tuple]:
+        """处理状态变化，返回待写入 alert_logs 的记录"""
+        alert_rows = []
         if old_status == new_status:
-            return
+            return alert_rows
         
-        self.logger.warning(f"网站状态变化: {website_name} {old_status} -> {new_status}")
+        self.logger.warning("网站状态变化: %s %s -> %s", website_name, old_status, new_status)
         
         # 构建警报消息
         if new_status == 'down':
@@ -414,92 +1098,107 @@ class WebsiteMonitor:
             # 邮件通知
             email_success = self.notification_manager.send_email_alert(subject, message)
             if email_success:
-                self.db_manager.log_alert(website_name, "email", subject, True)
+                alert_rows.append((website_name, "email", subject, True))
             
             # Webhook通知
             webhook_success = self.notification_manager.send_webhook_alert(
                 website_name, new_status, message
             )
             if webhook_success:
-                self.db_manager.log_alert(website_name, "webhook", subject, True)
+                alert_rows.append((website_name, "webhook", subject, True))
+        
+        return alert_rows
     
     def build_down_alert_message(self, result: Dict) -> str:
         """构建故障警报消息"""
-        return f"""
-        <html>
-        <body>
-            <h2>🚨 网站监控警报</h2>
-            <p><strong>网站名称:</strong> {result['name']}</p>
-            <p><strong>网站地址:</strong> {result['url']}</p>
-            <p><strong>当前状态:</strong> <span style="color: red;">离线</span></p>
-            <p><strong>错误信息:</strong> {result['error_message']}</p>
-            <p><strong>检查时间:</strong> {result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}</p>
-            
-            <hr>
-            <p style="color: gray; font-size: 12px;">
-                此邮件由网站监控系统自动发送，请及时处理网站故障。
-            </p>
-        </body>
-        </html>
-        """
+        return _DOWN_ALERT_TPL.substitute(
+            name=result['name'],
+            url=result['url'],
+            error_message=result['error_message'],
+            timestamp=result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
+        )
     
     def build_recovery_alert_message(self, result: Dict) -> str:
         """构建恢复通知消息"""
-        return f"""
-        <html>
-        <body>
-            <h2>✅ 网站恢复通知</h2>
-            <p><strong>网站名称:</strong> {result['name']}</p>
-            <p><strong>网站地址:</strong> {result['url']}</p>
-            <p><strong>当前状态:</strong> <span style="color: green;">在线</span></p>
-            <p><strong>响应时间:</strong> {result['response_time']}ms</p>
-            <p><strong>状态码:</strong> {result['status_code']}</p>
-            <p><strong>恢复时间:</strong> {result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}</p>
-            
-            <hr>
-            <p style="color: gray; font-size: 12px;">
-                网站已恢复正常访问，感谢您的关注。
-            </p>
-        </body>
-        </html>
-        """
+        return _RECOVERY_ALERT_TPL.substitute(
+            name=result['name'],
+            url=result['url'],
+            response_time=result['response_time'],
+            status_code=result['status_code'],
+            timestamp=result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
+        )
+    
+    def update_status(self, website: WebsiteConfig, check: tuple) -> str:
+        """更新网站状态并输出日志，返回之前的状态"""
+        # 获取之前的状态
+        site_status = self.website_status.get(website.name)
+        if site_status is None:
+            site_status = self.website_status[website.name] = SiteStatus(website.name, website.url)
+        old_status = site_status.status
+        
+        # 原地更新状态
+        site_status.update(*check)
+        
+        # 日志记录
+        if site_status.status == 'up':
+            self.logger.info(
+                "✅ %s 正常 - 响应时间: %sms", website.name, site_status.response_time
+            )
+        else:
+            self.logger.warning(
+                "❌ %s 异常 - %s", website.name, site_status.error_message
+            )
+        
+        return old_status
+    
+    async def _monitor_site(self, session: aiohttp.ClientSession, website: WebsiteConfig):
+        """检查单个网站并立即处理结果，不等待其他网站"""
+        loop = asyncio.get_running_loop()
+        try:
+            check = await self.check_website_async(session, website)
+            # 检查记录只是放入写入队列，不会阻塞事件循环
+            self.db_manager.log_checks_bulk([self.build_log_row(website, check)])
+            old_status = self.update_status(website, check)
+        except Exception as e:
+            self.logger.error("监控 %s 时发生错误: %s", website.name, e)
+            return
+        
+        new_status = check[0]
+        if old_status == new_status:
+            return
+        
+        # 状态变化的通知和警报记录在线程池中处理，通知所需的字典只在这里生成
+        try:
+            alert_rows = await loop.run_in_executor(
+                self._pool, self.handle_status_change,
+                website.name, old_status, new_status, self.build_result(website, check)
+            )
+        except Exception as e:
+            self.logger.error("发送 %s 的通知时发生错误: %s", website.name, e)
+            return
+        
+        try:
+            await loop.run_in_executor(self._pool, self.db_manager.log_alerts_bulk, alert_rows)
+        except Exception as e:
+            self.logger.error("写入监控记录失败: %s", e)
     
     def monitor_all_websites(self):
         """监控所有网站"""
         self.logger.info("开始监控所有网站...")
         
-        for website in self.websites:
-            try:
-                # 检查网站
-                result = self.check_website(website)
-                
-                # 获取之前的状态
-                old_status = self.website_status.get(website.name, {}).get('status', 'unknown')
-                
-                # 更新状态
-                self.website_status[website.name] = result
-                
-                # 处理状态变化
-                self.handle_status_change(website.name, old_status, result['status'], result)
-                
-                # 日志记录
-                if result['status'] == 'up':
-                    self.logger.info(
-                        f"✅ {website.name} 正常 - 响应时间: {result['response_time']}ms"
-                    )
-                else:
-                    self.logger.warning(
-                        f"❌ {website.name} 异常 - {result['error_message']}"
-                    )
-                    
-            except Exception as e:
-                self.logger.error(f"监控 {website.name} 时发生错误: {str(e)}")
+        async def _monitor():
+            async with self.create_session() as session:
+                await asyncio.gather(
+                    *(self._monitor_site(session, website) for website in self.websites)
+                )
+        
+        asyncio.run(_monitor())
     
     def get_status_summary(self) -> Dict:
         """获取状态摘要"""
         total = len(self.websites)
         up_count = sum(1 for status in self.website_status.values() 
-                      if status.get('status') == 'up')
+                      if status.status == 'up')
         down_count = total - up_count
         
         return {
@@ -509,6 +1208,100 @@ class WebsiteMonitor:
             'uptime_percentage': round((up_count / total * 100) if total > 0 else 0, 2)
         }
     
+    async def _scheduler_loop(self, session: aiohttp.ClientSession):
+        """按各网站的 check_interval 调度检查
+        
+        最小堆按下次到期时间（单调时钟）排序，每个到期网站单独一个任务，结果互不等待。
+        网站检查期间不在堆中，检查完成后才重新入堆，因此同一网站的检查不会重叠。
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        heap = [(now, index) for index in range(len(self.websites))]
+        heapq.heapify(heap)
+        in_flight: Dict[int, asyncio.Task] = {}
+        wakeup = asyncio.Event()
+        
+        def reschedule(index: int, due_time: float, task: asyncio.Task):
+            del in_flight[index]
+            if task.cancelled():
+                return
+            
+            # 以计划时间为基准推进，避免检查耗时累积造成漂移；落后一整个间隔以上时从当前时间重新计算
+            interval = max(self.websites[index].check_interval, 1)
+            now = loop.time()
+            next_due = due_time + interval
+            if next_due <= now:
+                next_due = now + interval
+            heapq.heappush(heap, (next_due, index))
+            wakeup.set()
+        
+        while True:
+            wakeup.clear()
+            now = loop.time()
+            while heap and heap[0][0] <= now:
+                due_time, index = heapq.heappop(heap)
+                task = asyncio.ensure_future(self._monitor_site(session, self.websites[index]))
+                in_flight[index] = task
+                task.add_done_callback(partial(reschedule, index, due_time))
+            
+            # 睡到下一个网站到期，或有检查完成重新入堆时提前醒来
+            delay = heap[0][0] - now if heap else None
+            try:
+                await asyncio.wait_for(wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _daily_report_loop(self):
+        """每天 09:00 发送状态报告"""
+        while True:
+            now = datetime.now()
+            next_run = now.replace(hour=9, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            await asyncio.sleep((next_run - now).total_seconds())
+            
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._pool, self.send_daily_report)
+            except Exception as e:
+                self.logger.error("每日报告发送失败: %s", e)
+            
+            try:
+                await loop.run_in_executor(self._pool, self.archive_old_logs)
+            except Exception as e:
+                self.logger.error("历史记录归档失败: %s", e)
+    
+    def archive_old_logs(self):
+        """把超过保留天数的检查记录归档为Parquet（需要安装pyarrow）"""
+        before = datetime.now(timezone.utc) - timedelta(days=_ARCHIVE_AFTER_DAYS)
+        try:
+            count = self.db_manager.archive_to_parquet(before)
+        except ImportError:
+            self.logger.info("未安装pyarrow，跳过历史记录归档")
+            return
+        
+        if count:
+            self.logger.info("已归档 %s 条历史记录到 %s", count, self.db_manager.archive_dir)
+    
+    def get_archived_stats(self, days: int = _ARCHIVE_STATS_DAYS) -> Dict[str, Dict]:
+        """读取Parquet归档中各网站最近 days 天的统计，未安装pyarrow或读取失败时返回空字典"""
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        try:
+            return self.db_manager.get_archived_stats(since)
+        except ImportError:
+            return {}
+        except Exception as e:
+            self.logger.warning("读取归档统计失败: %s", e)
+            return {}
+    
+    async def _run_forever(self):
+        """运行网站检查调度循环和每日报告循环"""
+        async with self.create_session() as session:
+            await asyncio.gather(
+                self._scheduler_loop(session),
+                self._daily_report_loop()
+            )
+    
     def start_monitoring(self):
         """启动监控"""
         if not self.websites:
@@ -516,25 +1309,24 @@ class WebsiteMonitor:
             return
         
         self.logger.info("🚀 网站监控器启动")
-        self.logger.info(f"监控网站数量: {len(self.websites)}")
-        
-        # 立即执行一次检查
-        self.monitor_all_websites()
-        
-        # 设置定期检查
-        schedule.every(5).minutes.do(self.monitor_all_websites)
+        self.logger.info("监控网站数量: %s", len(self.websites))
         
-        # 每天发送状态报告
-        schedule.every().day.at("09:00").do(self.send_daily_report)
-        
-        # 主循环
+        # 每个网站启动后立即检查一次，之后按各自间隔检查
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # 每分钟检查一次调度
+            asyncio.run(self._run_forever())
                 
         except KeyboardInterrupt:
             self.logger.info("监控器已停止")
+        finally:
+            self.close()
+    
+    def close(self):
+        """释放线程池和数据库连接"""
+        self._pool.shutdown(wait=True)
+        if self.notification_manager:
+            self.notification_manager.close()
+        self.db_manager.close()
+        self._log_listener.stop()
     
     def send_daily_report(self):
         """发送每日状态报告"""
@@ -542,51 +1334,33 @@ class WebsiteMonitor:
             return
         
         summary = self.get_status_summary()
-        report_html = f"""
-        <html>
-        <body>
-            <h2>📊 每日网站监控报告</h2>
-            <p><strong>报告日期:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
-            
-            <h3>状态概览</h3>
-            <ul>
-                <li>总监控网站: {summary['total']}</li>
-                <li>正常网站: {summary['up']}</li>
-                <li>异常网站: {summary['down']}</li>
-                <li>可用率: {summary['uptime_percentage']}%</li>
-            </ul>
-            
-            <h3>各网站当前状态</h3>
-            <table border="1" style="border-collapse: collapse;">
-                <tr>
-                    <th>网站名称</th>
-                    <th>状态</th>
-                    <th>响应时间</th>
-                    <th>最后检查时间</th>
-                </tr>
-        """
-        
+        archived = self.get_archived_stats()
+        rows = []
         for name, status in self.website_status.items():
-            status_color = "green" if status['status'] == 'up' else "red"
-            report_html += f"""
-                <tr>
-                    <td>{name}</td>
-                    <td style="color: {status_color};">{status['status']}</td>
-                    <td>{status['response_time'] or 'N/A'}ms</td>
-                    <td>{status['timestamp'].strftime('%H:%M:%S')}</td>
-                </tr>
-            """
-        
-        report_html += """
-            </table>
+            stats = archived.get(name)
+            if stats and stats['checks']:
+                archived_uptime = f"{stats['up'] / stats['checks'] * 100:.2f}%"
+                archived_response_time = (f"{stats['avg_response_time']}ms"
+                                          if stats['avg_response_time'] is not None else 'N/A')
+            else:
+                archived_uptime = archived_response_time = 'N/A'
             
-            <hr>
-            <p style="color: gray; font-size: 12px;">
-                网站监控系统每日自动报告
-            </p>
-        </body>
-        </html>
-        """
+            rows.append(_REPORT_ROW_TPL.substitute(
+                name=name,
+                color="green" if status.status == 'up' else "red",
+                status=status.status,
+                response_time=status.response_time or 'N/A',
+                time=(time.strftime('%H:%M:%S', time.localtime(status.ts_epoch))
+                      if status.ts_epoch is not None else 'N/A'),
+                archived_uptime=archived_uptime,
+                archived_response_time=archived_response_time
+            ))
+        report_html = _DAILY_REPORT_TPL.substitute(
+            date=datetime.now().strftime('%Y-%m-%d'),
+            rows="".join(rows),
+            archive_days=_ARCHIVE_STATS_DAYS,
+            **summary
+        )
         
         self.notification_manager.send_email_alert(
             f"📊 每日监控报告 - {datetime.now().strftime('%Y-%m-%d')}", 
@@ -603,7 +1377,7 @@ def main():
     try:
         monitor.start_monitoring()
     except Exception as e:
-        logging.error(f"监控器启动失败: {str(e)}")
+        logging.error("监控器启动失败: %s", e)
         return 1
     
     return 0